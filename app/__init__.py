@@ -33,27 +33,32 @@ def create_app(config_class=Config):
     app.config.from_pyfile('config.py', silent=True)
 
     # --- MongoDB Setup ---
-    try:
-        log.info("Starting MongoDB setup check...")
-        # Call the setup function which reads env variables
-        app_mongo_uri = setup_mongodb()
-
-        # --- Configure MongoEngine with the APPLICATION URI ---
-        log.info("Configuring Flask-MongoEngine with application user URI.")
-        app.config['MONGODB_SETTINGS'] = { # Flask-MongoEngine uses MONGODB_SETTINGS dict
-            'host': app_mongo_uri,
-            'connect': False # Explicitly set connect=False initially, MongoEngine connects on first query
-        }
-        # Alternatively, if using MONGODB_HOST directly was intended (check Flask-MongoEngine docs):
-        # app.config['MONGODB_HOST'] = app_mongo_uri
-
-    except ConfigurationError as e:
-        log.error(f"CRITICAL: MongoDB configuration error: {e}")
-        raise SystemExit(f"MongoDB configuration error: {e}") from e
-    except Exception as e:
-        log.error(f"CRITICAL: Failed to setup or connect to MongoDB: {e}")
-        raise SystemExit(f"Failed to setup/connect to MongoDB: {e}") from e
-    # --- End MongoDB Setup ---
+    if app.config.get('MONGODB_SETTINGS'):
+        # Settings supplied directly by the config class (e.g. the benchmark suite's
+        # local/mongomock database) - skip the admin user/database bootstrap.
+        log.info("Using MONGODB_SETTINGS from config, skipping MongoDB admin setup.")
+    else:
+        try:
+            log.info("Starting MongoDB setup check...")
+            # Call the setup function which reads env variables
+            app_mongo_uri = setup_mongodb()
+
+            # --- Configure MongoEngine with the APPLICATION URI ---
+            log.info("Configuring Flask-MongoEngine with application user URI.")
+            app.config['MONGODB_SETTINGS'] = { # Flask-MongoEngine uses MONGODB_SETTINGS dict
+                'host': app_mongo_uri,
+                'connect': False # Explicitly set connect=False initially, MongoEngine connects on first query
+            }
+            # Alternatively, if using MONGODB_HOST directly was intended (check Flask-MongoEngine docs):
+            # app.config['MONGODB_HOST'] = app_mongo_uri
+
+        except ConfigurationError as e:
+            log.error(f"CRITICAL: MongoDB configuration error: {e}")
+            raise SystemExit(f"MongoDB configuration error: {e}") from e
+        except Exception as e:
+            log.error(f"CRITICAL: Failed to setup or connect to MongoDB: {e}")
+            raise SystemExit(f"Failed to setup/connect to MongoDB: {e}") from e
+        # --- End MongoDB Setup ---
 
 
     # Initialize extensions AFTER DB config is set
@@ -88,6 +93,10 @@ def create_app(config_class=Config):
         # app.register_blueprint(api_bp, url_prefix='/api')
         log.info("Blueprints registered.")
 
+        # --- Register CLI Commands ---
+        from .metrics import metrics_cli # flask metrics rollup / backfill
+        app.cli.add_command(metrics_cli)
+
         # Perform check to ensure DB connection works with app credentials
         try:
             log.info("Performing initial DB connection test with app credentials...")
@@ -8,6 +8,6 @@ def admin_required(f):
     def decorated_function(*args, **kwargs):
         if not current_user.is_authenticated or not current_user.is_admin:
             flash('Admin access required for this page.', 'danger')
-            return redirect(url_for('dashboard')) # Redirect non-admins
+            return redirect(url_for('main.dashboard')) # Redirect non-admins
         return f(*args, **kwargs)
     return decorated_function
\ No newline at end of file
@@ -0,0 +1,293 @@
+# app/metrics.py
+"""
+Materialized daily project metrics (burndown / throughput).
+
+Snapshots live in the ProjectDailyMetrics collection, one document per project
+per UTC day. Pages and the JSON endpoint only ever read those snapshots, so a
+chart costs O(days) no matter how many tasks a project has.
+
+Two CLI commands keep the collection up to date:
+
+    flask metrics rollup              # incremental, meant to be run from cron
+    flask metrics backfill --days 90  # rebuild history from task timestamps
+
+Example crontab entry (every 15 minutes):
+
+    */15 * * * * cd /path/to/pandora_pm && flask metrics rollup
+
+Both commands are idempotent: every value is recomputed and upserted on
+(project, day), so re-running them never double counts.
+"""
+import datetime
+import logging
+
+import click
+from flask.cli import AppGroup
+
+from .models import Project, Task, ProjectDailyMetrics, MetricsRollupState, TASK_STATUS_CHOICES
+
+log = logging.getLogger(__name__)
+
+DONE_STATUS = 'Done'
+ONE_DAY = datetime.timedelta(days=1)
+WATERMARK_OVERLAP = datetime.timedelta(minutes=5) # Re-scan window for saves in flight during the last rollup
+# Due dates come from a DateField (midnight of the due day): a task is overdue once that day has ended.
+DUE_GRACE = ONE_DAY
+
+metrics_cli = AppGroup('metrics', help='Maintain the daily project metrics snapshots.')
+
+
+def day_start(dt):
+    """Truncates a datetime to midnight (UTC, naive - same as the model timestamps)."""
+    return datetime.datetime(dt.year, dt.month, dt.day)
+
+
+def _days(first_day, last_day):
+    day = first_day
+    while day <= last_day:
+        yield day
+        day += ONE_DAY
+
+
+def _projects_with_tasks(**filters):
+    """Returns the set of project ids that own at least one task matching the filters."""
+    pipeline = [{'$group': {'_id': '$project'}}]
+    return {row['_id'] for row in Task.objects(**filters).aggregate(pipeline)}
+
+
+def _current_state(project_id, now):
+    """Status counts and overdue count for a project as it stands right now."""
+    pipeline = [{'$group': {'_id': '$status', 'n': {'$sum': 1}}}]
+    status_counts = {row['_id']: row['n'] for row in Task.objects(project=project_id).aggregate(pipeline)}
+    total = sum(status_counts.values())
+    overdue = Task.objects(project=project_id, status__ne=DONE_STATUS, due_date__lt=now - DUE_GRACE).count()
+    return {
+        'status_counts': status_counts,
+        'total_count': total,
+        'open_count': total - status_counts.get(DONE_STATUS, 0),
+        'overdue_count': overdue,
+    }
+
+
+def _flow_counts(project_id, day):
+    """Tasks created and completed during the given day - exact, derived from timestamps."""
+    next_day = day + ONE_DAY
+    created = Task.objects(project=project_id, created_at__gte=day, created_at__lt=next_day).count()
+    completed = Task.objects(project=project_id, completed_at__gte=day, completed_at__lt=next_day).count()
+    return {'created_count': created, 'completed_count': completed}
+
+
+def _upsert_snapshot(project_id, day, now, values, on_insert=None):
+    update = {f'set__{key}': value for key, value in values.items()}
+    update['set__computed_at'] = now
+    for key, value in (on_insert or {}).items():
+        update[f'set_on_insert__{key}'] = value
+    ProjectDailyMetrics.objects(project=project_id, day=day).update_one(upsert=True, **update)
+
+
+def rollup(now=None):
+    """
+    Incrementally refreshes snapshots for projects whose tasks changed since the last run.
+
+    A project is refreshed when one of its tasks was saved after the watermark, or
+    when an open task's due day ended since then (the overdue count moves without
+    any write). Projects without changes are left alone - readers carry their last
+    snapshot forward.
+
+    The granularity is the project, not the task: changed tasks only select which
+    projects to refresh. Today's snapshot is recomputed with one status aggregation
+    plus three counts over the project's tasks (all index-backed), so a busy large
+    project pays a scan of its own tasks on every run that touches it.
+
+    Earlier days since the watermark (yesterday right after midnight, or several days
+    if cron missed runs) get their timestamp-derived fields - created, completed,
+    open, total, overdue - rebuilt like backfill() does, which loads the project's
+    tasks once. Their status_counts are not rewritten: the last rollup of that day
+    recorded the real statuses, and today's statuses would overwrite that history.
+    A missing past-day row is seeded with reconstructed status counts.
+
+    The first run (no watermark yet) refreshes every project. Returns the number of
+    projects refreshed.
+    """
+    now = now or datetime.datetime.utcnow()
+    today = day_start(now)
+    state = MetricsRollupState.objects(name='project_daily_metrics').first() or MetricsRollupState()
+    since = state.last_run_at
+
+    if since is None:
+        log.info("No metrics watermark found, refreshing today's snapshot for every project.")
+        project_ids = set(Project.objects.scalar('id'))
+        first_day = today
+    else:
+        # updated_at is stamped in Task.clean(), slightly before the write lands, so a
+        # save in flight during the previous run can carry an older timestamp than the
+        # watermark. Re-scanning a short overlap is safe: every value is recomputed.
+        window_start = since - WATERMARK_OVERLAP
+        project_ids = _projects_with_tasks(updated_at__gt=window_start, updated_at__lte=now)
+        project_ids |= _projects_with_tasks(due_date__gt=window_start - DUE_GRACE, due_date__lte=now - DUE_GRACE,
+                                            status__ne=DONE_STATUS)
+        first_day = min(day_start(window_start), today)
+
+    for project_id in project_ids:
+        if first_day < today:
+            _rebuild_snapshots(project_id, first_day, today - ONE_DAY, now, keep_status_counts=True)
+        current = _current_state(project_id, now)
+        _upsert_snapshot(project_id, today, now, dict(current, **_flow_counts(project_id, today)))
+
+    state.last_run_at = now
+    state.save()
+    log.info(f"Metrics rollup refreshed {len(project_ids)} project(s) up to {now.isoformat()}.")
+    return len(project_ids)
+
+
+def _rebuild_snapshots(project_id, first_day, last_day, now, keep_status_counts=False):
+    """
+    Rebuilds one snapshot per day in [first_day, last_day] from created_at /
+    completed_at / due_date. first_day=None starts at the project's first task.
+    With keep_status_counts, status_counts already stored on a row are left as-is.
+
+    Each task becomes a handful of timestamped events, sorted once and swept day by
+    day, so the cost is O(tasks log tasks + days). Returns the number of snapshots written.
+    """
+    tasks = list(Task.objects(project=project_id)
+                 .only('status', 'created_at', 'completed_at', 'updated_at', 'due_date')
+                 .as_pymongo())
+    if not tasks:
+        return 0
+
+    events = [] # (timestamp, kind, open status bucket)
+    for task in tasks:
+        created_at, completed_at, due_date = task['created_at'], task.get('completed_at'), task.get('due_date')
+        status = task.get('status')
+        if status == DONE_STATUS and not completed_at:
+            # Tasks completed before completed_at existed: best available guess.
+            completed_at = task.get('updated_at') or created_at
+        if completed_at:
+            completed_at = max(completed_at, created_at)
+        # No status history: while open, a task counts under its current status,
+        # or under 'To Do' if it has been completed since.
+        bucket = status if status != DONE_STATUS else 'To Do'
+
+        events.append((created_at, 'created', bucket))
+        if completed_at:
+            events.append((completed_at, 'completed', bucket))
+        if due_date:
+            overdue_from = max(due_date + DUE_GRACE, created_at)
+            if not completed_at or completed_at > overdue_from:
+                events.append((overdue_from, 'overdue', None))
+                if completed_at:
+                    events.append((completed_at, 'overdue_cleared', None))
+    events.sort(key=lambda event: event[0])
+
+    if first_day is None:
+        first_day = day_start(events[0][0])
+    status_counts = dict.fromkeys(TASK_STATUS_CHOICES, 0)
+    overdue = 0
+    position = 0
+    written = 0
+
+    for day in _days(first_day, last_day):
+        end = min(day + ONE_DAY, now)
+        created = completed = 0
+        while position < len(events) and events[position][0] < end:
+            timestamp, kind, bucket = events[position]
+            position += 1
+            in_day = timestamp >= day
+            if kind == 'created':
+                status_counts[bucket] += 1
+                created += in_day
+            elif kind == 'completed':
+                status_counts[bucket] -= 1
+                status_counts[DONE_STATUS] += 1
+                completed += in_day
+            elif kind == 'overdue':
+                overdue += 1
+            else:
+                overdue -= 1
+
+        counts = {status: n for status, n in status_counts.items() if n}
+        total = sum(counts.values())
+        values = {
+            'total_count': total,
+            'open_count': total - counts.get(DONE_STATUS, 0),
+            'created_count': created,
+            'completed_count': completed,
+            'overdue_count': overdue,
+        }
+        if keep_status_counts:
+            _upsert_snapshot(project_id, day, now, values, on_insert={'status_counts': counts})
+        else:
+            _upsert_snapshot(project_id, day, now, dict(values, status_counts=counts))
+        written += 1
+    return written
+
+
+def backfill(since=None, project_ids=None, now=None):
+    """
+    Rebuilds one snapshot per day from `since` (default: each project's first task) to today.
+
+    History is reconstructed from created_at / completed_at / due_date, so the
+    created, completed, open, total and overdue series are exact. Tasks keep no
+    status history, though: a task still open at the end of a past day is counted
+    under its current status, or under 'To Do' if it has been completed since.
+    Returns the number of snapshots written.
+    """
+    now = now or datetime.datetime.utcnow()
+    first_day = day_start(since) if since else None
+    projects = Project.objects(pk__in=project_ids) if project_ids else Project.objects
+    written = 0
+
+    for project_id in projects.scalar('id'):
+        written += _rebuild_snapshots(project_id, first_day, day_start(now), now)
+
+    log.info(f"Metrics backfill wrote {written} snapshot(s).")
+    return written
+
+
+def project_series(project, days=30, now=None):
+    """
+    Returns one metrics dict per day for the last `days` days, read from snapshots only.
+
+    Days without a snapshot (no changes that day) repeat the previous day's state
+    with zero created/completed. Days before the first snapshot are omitted.
+    """
+    now = now or datetime.datetime.utcnow()
+    today = day_start(now)
+    first_day = today - ONE_DAY * (days - 1)
+
+    snapshots = {s.day: s for s in ProjectDailyMetrics.objects(project=project, day__gte=first_day, day__lte=today)}
+    previous = (ProjectDailyMetrics.objects(project=project, day__lt=first_day)
+                .order_by('-day').first())
+
+    series = []
+    for day in _days(first_day, today):
+        snapshot = snapshots.get(day)
+        if snapshot:
+            previous = snapshot
+            series.append(snapshot.to_dict())
+        elif previous:
+            carried = previous.to_dict()
+            carried.update(day=day.strftime('%Y-%m-%d'), created=0, completed=0)
+            series.append(carried)
+    return series
+
+
+# --- CLI Commands ---
+
+@metrics_cli.command('rollup')
+def rollup_command():
+    """Incrementally refresh today's snapshots (run from cron)."""
+    count = rollup()
+    click.echo(f"Refreshed metrics for {count} project(s).")
+
+
+@metrics_cli.command('backfill')
+@click.option('--days', type=int, default=None, help='Only rebuild the last N days (default: full history).')
+@click.option('--project', 'project_ids', multiple=True, help='Restrict to these project ids (repeatable).')
+def backfill_command(days, project_ids):
+    """Rebuild historical snapshots from task timestamps."""
+    since = None
+    if days:
+        since = day_start(datetime.datetime.utcnow()) - ONE_DAY * (days - 1)
+    count = backfill(since=since, project_ids=list(project_ids) or None)
+    click.echo(f"Wrote {count} snapshot(s).")
@@ -46,8 +46,59 @@ class Task(db.Document):
     created_by = db.ReferenceField(User, required=True) # Who created the task (usually admin)
     created_at = db.DateTimeField(default=datetime.datetime.utcnow)
     due_date = db.DateTimeField(null=True, blank=True) # Optional due date
+    updated_at = db.DateTimeField(default=datetime.datetime.utcnow) # Bumped on every save, drives incremental metrics rollup
+    completed_at = db.DateTimeField(null=True) # Set when status moves to 'Done', cleared if reopened
 
-    meta = {'indexes': ['project', 'assigned_to', 'status']} # Indexes for common queries
+    meta = {'indexes': ['project', 'assigned_to', 'status', 'updated_at', 'due_date']} # Indexes for common queries
+
+    def clean(self):
+        """Runs on every save(): keeps the timestamps used by app.metrics in sync."""
+        now = datetime.datetime.utcnow()
+        self.updated_at = now
+        if self.status == 'Done':
+            if not self.completed_at:
+                self.completed_at = now
+        else:
+            self.completed_at = None
+
+    def __repr__(self):
+        return f"Task('{self.title}', Status: '{self.status}', Project: '{self.project.name}')"
+
+class ProjectDailyMetrics(db.Document):
+    """
+    One materialized snapshot per project per (UTC) day, written by app.metrics.
+    Charts and the metrics JSON endpoint read only from here, never from Task.
+    """
+    project = db.ReferenceField(Project, required=True, reverse_delete_rule=db.CASCADE)
+    day = db.DateTimeField(required=True) # Midnight UTC of the snapshot day
+    status_counts = db.DictField() # e.g. {'To Do': 3, 'Done': 5}, state at end of day (or at last rollup for today)
+    total_count = db.IntField(default=0)
+    open_count = db.IntField(default=0) # Everything not 'Done' - the burndown line
+    created_count = db.IntField(default=0) # Tasks created during this day
+    completed_count = db.IntField(default=0) # Tasks completed during this day - the throughput bars
+    overdue_count = db.IntField(default=0) # Open tasks whose due date had passed
+    computed_at = db.DateTimeField(default=datetime.datetime.utcnow)
+
+    meta = {'indexes': [{'fields': ['project', 'day'], 'unique': True}]}
+
+    def to_dict(self):
+        return {
+            'day': self.day.strftime('%Y-%m-%d'),
+            'status_counts': {status: self.status_counts.get(status, 0) for status in TASK_STATUS_CHOICES},
+            'total': self.total_count,
+            'open': self.open_count,
+            'created': self.created_count,
+            'completed': self.completed_count,
+            'overdue': self.overdue_count,
+        }
+
+    def __repr__(self):
+        return f"ProjectDailyMetrics('{self.project.pk}', {self.day:%Y-%m-%d})"
+
+class MetricsRollupState(db.Document):
+    """Watermark for the incremental rollup: tasks updated after last_run_at are still unprocessed."""
+    name = db.StringField(required=True, unique=True, default='project_daily_metrics')
+    last_run_at = db.DateTimeField()
 
     def __repr__(self):
-        return f"Task('{self.title}', Status: '{self.status}', Project: '{self.project.name}')"
\ No newline at end of file
+        return f"MetricsRollupState('{self.name}', last_run_at={self.last_run_at})"
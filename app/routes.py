@@ -1,6 +1,6 @@
 # app/routes.py
 from flask import (
-    render_template, url_for, flash, redirect, request, abort, Blueprint, current_app
+    render_template, url_for, flash, redirect, request, abort, Blueprint, current_app, jsonify
 )
 # Import extensions initialized in __init__
 from . import db, bcrypt, login_manager # Import login_manager if needed for decorators directly
@@ -11,6 +11,7 @@ from .forms import (
 )
 from .models import User, Project, Task
 from .decorators import admin_required
+from .metrics import project_series
 
 # Import Flask-Login utilities
 from flask_login import login_user, current_user, logout_user, login_required
@@ -156,6 +157,28 @@ def project_detail(project_id):
     tasks = Task.objects(project=project).order_by('status', 'due_date')
     return render_template('project_detail.html', title=project.name, project=project, tasks=tasks)
 
+def _metrics_days():
+    """Reads the ?days= window for the metrics views, clamped to 1..365."""
+    return max(1, min(request.args.get('days', 30, type=int), 365))
+
+@main_routes.route('/project/<project_id>/metrics')
+@login_required
+def project_metrics(project_id):
+    """Burndown and throughput charts, drawn from the daily metrics snapshots."""
+    project = Project.objects(pk=project_id).first_or_404()
+    days = _metrics_days()
+    series = project_series(project, days=days)
+    return render_template('project_metrics.html', title=f'{project.name} Metrics',
+                           project=project, series=series, days=days)
+
+@main_routes.route('/project/<project_id>/metrics.json')
+@login_required
+def project_metrics_json(project_id):
+    """Daily metrics snapshots as JSON (reads snapshots only, never raw tasks)."""
+    project = Project.objects(pk=project_id).first_or_404()
+    days = _metrics_days()
+    return jsonify(project_id=str(project.id), days=days, series=project_series(project, days=days))
+
 # --- Task Routes ---
 
 @main_routes.route('/project/<project_id>/task/new', methods=['GET', 'POST'])
@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+# Route benchmark suite - run with `python -m benchmarks.run` (see benchmarks/run.py).
@@ -0,0 +1,103 @@
+# benchmarks/compare.py
+"""
+Compares a benchmark results file against a stored baseline.
+
+    python -m benchmarks.compare benchmarks/results.json benchmarks/baseline.json
+
+A route/role is flagged as a regression when:
+
+    - its p50 latency grew by more than --threshold (relative) and by more than
+      --min-delta-ms (absolute), AND its p95 grew by more than --threshold too.
+      A single slow sample moves the tail, but not the median; a real slowdown
+      moves both. Latencies are the best-of-rounds figures from benchmarks/run.py.
+    - it issues more MongoDB queries per request than before (queries are
+      deterministic for a given seed, so any increase is real)
+    - its peak memory grew by more than --threshold and more than 64 KiB
+    - it returns a 4xx/5xx status code the baseline never saw (a route going
+      from 500 to 302 is a fix, not a regression)
+
+Exits with status 1 when any regression is found, so it can gate CI.
+"""
+import argparse
+import json
+import sys
+
+MIN_MEMORY_DELTA_KIB = 64.0
+
+
+def compare(current, baseline, threshold=0.25, min_delta_ms=1.0):
+    """
+    Returns (regressions, notes): lists of human readable strings. Routes that only
+    exist on one side are reported as notes, not regressions.
+    """
+    regressions, notes = [], []
+    current_results, baseline_results = current['results'], baseline['results']
+
+    if current['meta'].get('dataset') != baseline['meta'].get('dataset'):
+        notes.append(f"Dataset differs: {current['meta'].get('dataset')} vs baseline {baseline['meta'].get('dataset')}")
+    if current['meta'].get('backend') != baseline['meta'].get('backend'):
+        notes.append(f"Backend differs: {current['meta'].get('backend')} vs baseline {baseline['meta'].get('backend')}")
+
+    for key in sorted(set(baseline_results) - set(current_results)):
+        notes.append(f"{key}: missing from current results")
+    for key in sorted(set(current_results) - set(baseline_results)):
+        notes.append(f"{key}: new, no baseline")
+
+    for key in sorted(set(current_results) & set(baseline_results)):
+        cur, base = current_results[key], baseline_results[key]
+
+        cur_p50, base_p50 = cur['latency_ms']['p50'], base['latency_ms']['p50']
+        cur_p95, base_p95 = cur['latency_ms']['p95'], base['latency_ms']['p95']
+        if (cur_p50 > base_p50 * (1 + threshold) and cur_p50 - base_p50 > min_delta_ms
+                and cur_p95 > base_p95 * (1 + threshold)):
+            change = (cur_p50 / base_p50 - 1) * 100 if base_p50 else float('inf')
+            regressions.append(f"{key}: p50 latency {base_p50:.2f}ms -> {cur_p50:.2f}ms (+{change:.0f}%), "
+                               f"p95 {base_p95:.2f}ms -> {cur_p95:.2f}ms")
+
+        cur_queries, base_queries = cur['queries_per_request']['mean'], base['queries_per_request']['mean']
+        if cur_queries > base_queries:
+            regressions.append(f"{key}: queries/request {base_queries} -> {cur_queries}")
+
+        cur_mem, base_mem = cur['peak_memory_kib'], base['peak_memory_kib']
+        if cur_mem > base_mem * (1 + threshold) and cur_mem - base_mem > MIN_MEMORY_DELTA_KIB:
+            regressions.append(f"{key}: peak memory {base_mem:.1f}KiB -> {cur_mem:.1f}KiB")
+
+        new_codes = set(cur['status_codes']) - set(base['status_codes'])
+        new_failures = sorted(code for code in new_codes if int(code) >= 400)
+        if new_failures:
+            regressions.append(f"{key}: new error status {new_failures} (baseline: {sorted(base['status_codes'])})")
+
+    return regressions, notes
+
+
+def compare_files(current_path, baseline_path, threshold=0.25, min_delta_ms=1.0):
+    """Loads both files, prints the report and returns the process exit code."""
+    with open(current_path) as fh:
+        current = json.load(fh)
+    with open(baseline_path) as fh:
+        baseline = json.load(fh)
+
+    regressions, notes = compare(current, baseline, threshold=threshold, min_delta_ms=min_delta_ms)
+    for note in notes:
+        print(f"NOTE  {note}")
+    for regression in regressions:
+        print(f"REGRESSION  {regression}")
+    compared = len(set(current['results']) & set(baseline['results']))
+    print(f"{len(regressions)} regression(s) across {compared} compared route(s).")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Flag benchmark regressions against a baseline.')
+    parser.add_argument('current', help='Results file to check')
+    parser.add_argument('baseline', help='Stored baseline results file')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Relative growth tolerated before flagging (0.25 = 25%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                        help='Ignore p50 latency changes smaller than this many milliseconds')
+    args = parser.parse_args(argv)
+    return compare_files(args.current, args.baseline, threshold=args.threshold, min_delta_ms=args.min_delta_ms)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
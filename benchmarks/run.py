@@ -0,0 +1,413 @@
+# benchmarks/run.py
+"""
+Route benchmark suite.
+
+Seeds a throwaway database, drives every route registered on the `main`
+blueprint through the Flask test client as the admin and as a regular user
+(plus anonymously for the auth pages), and records per route:
+
+    - latency percentiles (ms), from the best of --rounds interleaved passes
+      (lowest p50), with the garbage collector paused while timing. Shared
+      hosts and CI runners drift by tens of percent for seconds at a time;
+      many short passes spread over the whole run reliably catch a quiet one,
+      and that floor repeats from run to run where a single pass does not.
+    - MongoDB queries per request
+    - peak Python memory allocated while serving one request (KiB, tracemalloc)
+
+Usage (from the repository root):
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.run                                   # mongomock, fast
+    python -m benchmarks.run --backend mongodb --mongo-uri mongodb://localhost:27017/pandora_pm_bench
+    python -m benchmarks.run --tasks 5000 --output benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json   # run, then flag regressions
+
+The target database is DROPPED before seeding, so its name must contain 'bench'.
+Results are written as JSON; see benchmarks/compare.py for the comparison rules.
+"""
+import argparse
+import datetime
+import gc
+import itertools
+import json
+import logging
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import Counter, namedtuple
+
+from pymongo import monitoring
+
+from app.models import User, Project, Task, TASK_STATUS_CHOICES
+from config import Config
+
+log = logging.getLogger(__name__)
+
+# Commands pymongo issues for connection management rather than on behalf of a route.
+IGNORED_COMMANDS = {'hello', 'ismaster', 'isMaster', 'ping', 'endSessions', 'saslStart', 'saslContinue'}
+
+# Collection methods that cost a round trip on a real server; counted on the mongomock backend.
+MONGOMOCK_OPERATIONS = (
+    'find', 'find_one', 'count_documents', 'estimated_document_count', 'distinct', 'aggregate',
+    'insert_one', 'insert_many', 'update_one', 'update_many', 'replace_one',
+    'delete_one', 'delete_many', 'find_one_and_update', 'find_one_and_replace',
+    'find_one_and_delete', 'bulk_write',
+)
+
+ROLES = ('admin', 'user')
+
+Scenario = namedtuple('Scenario', 'endpoint method roles url_kwargs data cleanup', defaults=(None,))
+
+
+class QueryCounter(monitoring.CommandListener):
+    """Counts commands sent to MongoDB. Registered globally, before any client exists."""
+
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        if event.command_name not in IGNORED_COMMANDS:
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def instrument_mongomock(counter):
+    """
+    mongomock emits no command events, so count calls to its collection methods
+    instead. Only the outermost call is counted (find_one is built on find, etc.).
+    """
+    from functools import wraps
+    from mongomock.collection import Collection
+
+    depth = {'value': 0}
+
+    def counted(method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            if depth['value'] == 0:
+                counter.count += 1
+            depth['value'] += 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                depth['value'] -= 1
+        return wrapper
+
+    for name in MONGOMOCK_OPERATIONS:
+        if hasattr(Collection, name):
+            setattr(Collection, name, counted(getattr(Collection, name)))
+
+
+def mongodb_settings(args):
+    if args.backend == 'mongomock':
+        import mongomock
+        # flask-mongoengine takes the database name from the host URI, not from a 'db' key.
+        return {'host': f'mongodb://localhost/{args.db_name}', 'mongo_client_class': mongomock.MongoClient}
+    return {'host': args.mongo_uri}
+
+
+def build_scenarios(ids):
+    """
+    One entry per (endpoint, method). `data` is a callable taking a running
+    counter so POSTs that create documents never collide with earlier runs.
+    `cleanup` (same counter) deletes whatever the request created, untimed, so
+    every request sees the seeded dataset rather than one that grows per round.
+    """
+    auth_roles = ROLES + ('anonymous',)
+    project = {'project_id': ids['project_id']}
+    task = {'task_id': ids['task_id']}
+    return [
+        Scenario('main.index', 'GET', auth_roles, {}, None),
+        Scenario('main.register', 'GET', auth_roles, {}, None),
+        Scenario('main.register', 'POST', auth_roles, {}, lambda n: {
+            'username': f'bench_reg_{n}', 'email': f'bench_reg_{n}@example.com',
+            'password': 'benchmark-password', 'confirm_password': 'benchmark-password'},
+            lambda n: User.objects(username=f'bench_reg_{n}').delete()),
+        Scenario('main.login', 'GET', auth_roles, {}, None),
+        Scenario('main.login', 'POST', auth_roles, {}, lambda n: {
+            'email': 'bench_user_00001@example.com', 'password': 'benchmark-password'}),
+        Scenario('main.logout', 'GET', ROLES, {}, None),
+        Scenario('main.dashboard', 'GET', ROLES, {}, None),
+        Scenario('main.list_projects', 'GET', ROLES, {}, None),
+        Scenario('main.create_project', 'GET', ROLES, {}, None),
+        Scenario('main.create_project', 'POST', ROLES, {}, lambda n: {
+            'name': f'Bench New Project {n}', 'description': 'Created by the benchmark'},
+            lambda n: Project.objects(name=f'Bench New Project {n}').delete()),
+        Scenario('main.project_detail', 'GET', ROLES, project, None),
+        Scenario('main.project_metrics', 'GET', ROLES, project, None),
+        Scenario('main.project_metrics_json', 'GET', ROLES, project, None),
+        Scenario('main.create_task', 'GET', ROLES, project, None),
+        Scenario('main.create_task', 'POST', ROLES, project, lambda n: {
+            'title': f'Bench New Task {n}', 'description': 'Created by the benchmark',
+            'assigned_to': ids['user_id'], 'status': 'To Do', 'due_date': '2030-01-01'},
+            lambda n: Task.objects(title=f'Bench New Task {n}').delete()),
+        Scenario('main.task_detail', 'GET', ROLES, task, None),
+        Scenario('main.task_detail', 'POST', ROLES, task, lambda n: {
+            'status': TASK_STATUS_CHOICES[n % len(TASK_STATUS_CHOICES)]}),
+        Scenario('main.admin_console', 'GET', ROLES, {}, None),
+        Scenario('main.admin_list_users', 'GET', ROLES, {}, None),
+        Scenario('main.admin_toggle_admin', 'POST', ROLES, {'user_id': ids['toggle_user_id']}, None),
+    ]
+
+
+def check_coverage(app, scenarios):
+    """Fails loudly if a route on the main blueprint has no scenario for both roles."""
+    covered = {(s.endpoint, s.method, role) for s in scenarios for role in s.roles}
+    missing = sorted(
+        f"{method} {rule.endpoint} [{role}]"
+        for rule in app.url_map.iter_rules() if rule.endpoint.startswith('main.')
+        for method in rule.methods - {'HEAD', 'OPTIONS'}
+        for role in ROLES
+        if (rule.endpoint, method, role) not in covered
+    )
+    if missing:
+        raise SystemExit("Benchmark scenarios missing for: " + ", ".join(missing))
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(rounds, peak_memory):
+    """
+    Reduces the (latencies, queries, statuses) of each round to one result. Latency
+    comes from the round with the lowest p50 - noise only ever adds time, so the
+    best round is the most repeatable estimate. Queries and status codes are
+    aggregated over every round.
+    """
+    ordered = min((sorted(latencies) for latencies, _, _ in rounds), key=lambda values: percentile(values, 50))
+    queries = [count for _, round_queries, _ in rounds for count in round_queries]
+    statuses = sum((round_statuses for _, _, round_statuses in rounds), Counter())
+    return {
+        'rounds': len(rounds),
+        'samples': len(ordered),
+        'status_codes': {str(code): n for code, n in sorted(statuses.items())},
+        'errors': sum(n for code, n in statuses.items() if code >= 500),
+        'latency_ms': {
+            'min': round(ordered[0], 3),
+            'p50': round(percentile(ordered, 50), 3),
+            'p90': round(percentile(ordered, 90), 3),
+            'p95': round(percentile(ordered, 95), 3),
+            'p99': round(percentile(ordered, 99), 3),
+            'max': round(ordered[-1], 3),
+            'mean': round(statistics.fmean(ordered), 3),
+        },
+        'queries_per_request': {'mean': round(statistics.fmean(queries), 2), 'max': max(queries)},
+        'peak_memory_kib': round(peak_memory / 1024.0, 1),
+    }
+
+
+class RouteBenchmark:
+    """Holds one logged-in test client per role and times requests through them."""
+
+    def __init__(self, app, ids, counter):
+        self.app = app
+        self.ids = ids
+        self.counter = counter
+        self.clients = {role: app.test_client() for role in ROLES + ('anonymous',)}
+        self.sequence = itertools.count()
+
+    def _prepare(self, role):
+        # Reset the session to the role's identity outside the timed region:
+        # logout and login POSTs change it as a side effect.
+        with self.clients[role].session_transaction() as session:
+            session.clear()
+            if role != 'anonymous':
+                session['_user_id'] = self.ids['admin_id' if role == 'admin' else 'user_id']
+                session['_fresh'] = True
+
+    def _request(self, scenario, role, url):
+        number = next(self.sequence)
+        data = scenario.data(number) if scenario.data else None
+        self._prepare(role)
+        queries_before = self.counter.count
+        started = time.perf_counter()
+        response = self.clients[role].open(url, method=scenario.method, data=data)
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        queries = self.counter.count - queries_before
+        response.close()
+        if scenario.cleanup:
+            with self.app.app_context():
+                scenario.cleanup(number)
+        return elapsed_ms, queries, response.status_code
+
+    def _url(self, scenario):
+        with self.app.test_request_context():
+            from flask import url_for
+            return url_for(scenario.endpoint, **scenario.url_kwargs)
+
+    def measure(self, scenario, role, iterations, warmup):
+        """One round: untimed warmup, then timed requests. Returns (latencies, queries, statuses)."""
+        url = self._url(scenario)
+        for _ in range(warmup):
+            self._request(scenario, role, url)
+
+        latencies, queries, statuses = [], [], Counter()
+        # Keep garbage collection pauses out of the timed requests.
+        gc.collect()
+        gc.disable()
+        try:
+            for _ in range(iterations):
+                elapsed_ms, query_count, status = self._request(scenario, role, url)
+                latencies.append(elapsed_ms)
+                queries.append(query_count)
+                statuses[status] += 1
+        finally:
+            gc.enable()
+        return latencies, queries, statuses
+
+    def peak_memory(self, scenario, role, memory_samples):
+        """
+        Peak traced allocation over a few requests. Sampled separately from the timed
+        requests: tracing slows everything down and would distort the latencies.
+        """
+        url = self._url(scenario)
+        peak_memory = 0
+        for _ in range(memory_samples):
+            tracemalloc.start()
+            try:
+                self._request(scenario, role, url)
+                peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+        return peak_memory
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--backend', choices=('mongomock', 'mongodb'), default='mongomock',
+                        help='mongomock (in-process, default) or a real local MongoDB')
+    parser.add_argument('--mongo-uri', default='mongodb://localhost:27017/pandora_pm_bench',
+                        help='Connection URI for --backend mongodb (database is dropped!)')
+    parser.add_argument('--db-name', default='pandora_pm_bench', help='Database name for --backend mongomock')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--projects', type=int, default=10)
+    parser.add_argument('--tasks', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=15, help='Timed requests per route and role, per round')
+    parser.add_argument('--rounds', type=int, default=10,
+                        help='Interleaved passes over all routes; latency is taken from the best one')
+    parser.add_argument('--warmup', type=int, default=2, help='Untimed requests before timing')
+    parser.add_argument('--memory-samples', type=int, default=3, help='Traced requests for peak memory')
+    parser.add_argument('--only', default=None, help='Only run endpoints containing this substring')
+    parser.add_argument('--output', default=os.path.join('benchmarks', 'results.json'))
+    parser.add_argument('--baseline', default=None, help='Compare against this results file afterwards')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Relative slowdown tolerated before flagging a regression (0.25 = 25%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                        help='Ignore p50 latency changes smaller than this many milliseconds')
+    parser.add_argument('--verbose', action='store_true', help='Keep application logging enabled')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if not args.verbose:
+        # Routes log every 404/500 with a traceback; the status codes are in the results anyway.
+        logging.getLogger('app').setLevel(logging.CRITICAL)
+
+    counter = QueryCounter()
+    if args.backend == 'mongomock':
+        instrument_mongomock(counter)
+    else:
+        monitoring.register(counter) # Must happen before MongoEngine creates its client
+
+    class BenchmarkConfig(Config):
+        WTF_CSRF_ENABLED = False
+        # .env may enable debug mode; route exceptions must become 500 responses
+        # (recorded in the results) rather than propagate and abort the run.
+        DEBUG = False
+        TESTING = False
+        PROPAGATE_EXCEPTIONS = False
+        # Password hashing cost is a config knob, not something code changes regress;
+        # the minimum keeps the login/register scenarios from dominating the run time.
+        BCRYPT_LOG_ROUNDS = 4
+        MONGODB_SETTINGS = mongodb_settings(args)
+
+    from app import create_app
+    from mongoengine.connection import get_db
+    from .seed import seed_database
+
+    app = create_app(BenchmarkConfig)
+    results = {}
+    with app.app_context():
+        database = get_db()
+        if 'bench' not in database.name:
+            raise SystemExit(f"Refusing to drop database '{database.name}': its name must contain 'bench'.")
+        database.client.drop_database(database.name)
+
+        log.info(f"Seeding {args.users} users, {args.projects} projects, {args.tasks} tasks (seed={args.seed})...")
+        ids = seed_database(users=args.users, projects=args.projects, tasks=args.tasks, seed=args.seed)
+        log.info(f"Seeded {ids['counts']}.")
+
+    scenarios = build_scenarios(ids)
+    check_coverage(app, scenarios)
+
+    bench = RouteBenchmark(app, ids, counter)
+    selected = [(scenario, role) for scenario in scenarios for role in scenario.roles
+                if not args.only or args.only in scenario.endpoint]
+    rounds = {}
+    # Whole passes are interleaved so a burst of background load spreads across
+    # routes instead of ruining every sample of one of them.
+    for number in range(1, args.rounds + 1):
+        log.info(f"Round {number}/{args.rounds}...")
+        for scenario, role in selected:
+            key = f"{scenario.method} {scenario.endpoint} [{role}]"
+            rounds.setdefault(key, []).append(bench.measure(scenario, role, args.iterations, args.warmup))
+
+    for scenario, role in selected:
+        key = f"{scenario.method} {scenario.endpoint} [{role}]"
+        results[key] = dict(endpoint=scenario.endpoint, method=scenario.method, role=role,
+                            **summarize(rounds[key], bench.peak_memory(scenario, role, args.memory_samples)))
+        log.info(f"{key}: p50={results[key]['latency_ms']['p50']}ms "
+                 f"p95={results[key]['latency_ms']['p95']}ms "
+                 f"queries={results[key]['queries_per_request']['mean']}")
+        if results[key]['errors']:
+            log.warning(f"{key}: {results[key]['errors']} responses were 5xx "
+                        f"- its timings measure the error page, not the route.")
+
+    report = {
+        'meta': {
+            'created_at': datetime.datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'backend': args.backend,
+            'seed': args.seed,
+            'dataset': ids['counts'],
+            'iterations': args.iterations,
+            'rounds': args.rounds,
+            'warmup': args.warmup,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, 'w') as fh:
+        json.dump(report, fh, indent=2, sort_keys=True)
+    log.info(f"Wrote {len(results)} route results to {args.output}.")
+    failing = sorted(key for key, result in results.items() if result['errors'])
+    if failing:
+        log.warning(f"{len(failing)} route(s) returned server errors (see 'errors' in the results; "
+                    f"don't save this run as a baseline without reviewing them): " + ", ".join(failing))
+
+    if args.baseline:
+        from .compare import compare_files
+        return compare_files(args.output, args.baseline, threshold=args.threshold, min_delta_ms=args.min_delta_ms)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+# benchmarks/seed.py
+"""
+Deterministic data seeding for the benchmark suite.
+
+Everything (names, statuses, assignments, timestamps) is drawn from a
+random.Random(seed). Timestamps are offsets from a base date HISTORY_DAYS
+before today (midnight UTC), so the same arguments always produce the same
+dataset shape and the metrics snapshots always cover the charted window.
+"""
+import datetime
+import random
+
+from app import bcrypt
+from app.metrics import backfill, day_start
+from app.models import User, Project, Task, TASK_STATUS_CHOICES
+
+HISTORY_DAYS = 180
+BENCH_PASSWORD = 'benchmark-password'
+
+
+def seed_database(users=20, projects=10, tasks=500, seed=42):
+    """
+    Seeds users, projects and tasks. The first user is the admin, the second the
+    regular user the suite logs in as; one extra user exists only to be toggled
+    by the admin route. Daily metrics snapshots are backfilled for the whole
+    history. Returns a dict of the ids the route scenarios need.
+    """
+    rng = random.Random(seed)
+    now = datetime.datetime.utcnow()
+    base_date = day_start(now) - datetime.timedelta(days=HISTORY_DAYS)
+    users = max(users, 2)
+    projects = max(projects, 1)
+    tasks = max(tasks, 1)
+
+    # Hashing is deliberately slow - compute it once and share it across all seeded users.
+    password_hash = bcrypt.generate_password_hash(BENCH_PASSWORD).decode('utf-8')
+
+    user_docs = [User(username=f'bench_user_{i:05d}', email=f'bench_user_{i:05d}@example.com',
+                      password_hash=password_hash, is_admin=(i == 0),
+                      created_at=base_date + datetime.timedelta(minutes=i))
+                 for i in range(users)]
+    user_docs.append(User(username='bench_toggle_target', email='bench_toggle_target@example.com',
+                          password_hash=password_hash, created_at=base_date))
+    user_docs = User.objects.insert(user_docs)
+    admin, regular, toggle_target = user_docs[0], user_docs[1], user_docs[-1]
+
+    project_docs = Project.objects.insert([
+        Project(name=f'Bench Project {i:04d}', description=f'Seeded project {i}',
+                created_by=admin, created_at=base_date + datetime.timedelta(hours=i))
+        for i in range(projects)
+    ])
+
+    task_docs = []
+    for i in range(tasks):
+        created_at = base_date + datetime.timedelta(minutes=rng.randrange(0, 60 * 24 * HISTORY_DAYS))
+        status = rng.choice(TASK_STATUS_CHOICES)
+        completed_at = None
+        if status == 'Done':
+            completed_at = min(created_at + datetime.timedelta(hours=rng.randrange(1, 24 * 30)), now)
+        due_date = created_at + datetime.timedelta(days=rng.randrange(1, 60)) if rng.random() < 0.7 else None
+        # Make sure the regular user always owns some work, whatever the user count.
+        assignee = regular if i % 5 == 0 else rng.choice(user_docs[:users])
+        task_docs.append(Task(title=f'Bench Task {i:06d}', description=f'Seeded task {i}',
+                              status=status, project=rng.choice(project_docs),
+                              assigned_to=assignee, created_by=admin,
+                              created_at=created_at, updated_at=completed_at or created_at,
+                              completed_at=completed_at, due_date=due_date))
+    task_docs = Task.objects.insert(task_docs)
+    snapshots = backfill(since=base_date, now=now)
+
+    return {
+        'admin_id': str(admin.pk),
+        'user_id': str(regular.pk),
+        'toggle_user_id': str(toggle_target.pk),
+        'project_id': str(project_docs[0].pk),
+        'task_id': str(task_docs[0].pk), # Assigned to the regular user (i % 5 == 0)
+        'counts': {'users': len(user_docs), 'projects': len(project_docs), 'tasks': len(task_docs),
+                   'snapshots': snapshots},
+    }
@@ -0,0 +1,101 @@
+# tests/test_metrics.py
+import datetime
+
+import pytest
+
+mongomock = pytest.importorskip('mongomock')
+pytest.importorskip('flask_mongoengine', exc_type=ImportError) # 1.0 needs Flask < 2.3
+
+from config import Config
+from app import create_app
+from app.models import User, Project, Task, ProjectDailyMetrics, MetricsRollupState
+from app.metrics import rollup, backfill, project_series, _current_state
+
+D = datetime.datetime
+
+
+class MetricsTestConfig(Config):
+    TESTING = True
+    WTF_CSRF_ENABLED = False
+    MONGODB_SETTINGS = {'host': 'mongodb://localhost/pandora_pm_test', 'mongo_client_class': mongomock.MongoClient}
+
+
+@pytest.fixture(scope='module')
+def app():
+    app = create_app(MetricsTestConfig)
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def project(app):
+    for model in (ProjectDailyMetrics, MetricsRollupState, Task, Project, User):
+        model.objects.delete()
+    user = User(username='owner', email='owner@example.com', password_hash='x', is_admin=True).save()
+    return Project(name='Metrics', created_by=user).save()
+
+
+def make_task(project, created_at, status='To Do', due_date=None):
+    task = Task(title='t', project=project, assigned_to=project.created_by, created_by=project.created_by,
+                status=status, created_at=created_at, due_date=due_date).save()
+    Task.objects(pk=task.pk).update(set__updated_at=created_at)
+    return task
+
+
+def set_status(task, status, at):
+    """Changes status as the task_detail route would, then pins the timestamps to `at`."""
+    task.reload()
+    task.status = status
+    task.save()
+    Task.objects(pk=task.pk).update(set__updated_at=at, set__completed_at=at if status == 'Done' else None)
+
+
+def snapshot(project, day):
+    return ProjectDailyMetrics.objects(project=project, day=day).first()
+
+
+def test_midnight_rollup_keeps_past_day_status_counts(project):
+    task = make_task(project, D(2026, 10, 10, 9), status='In Progress')
+    rollup(now=D(2026, 10, 10, 23, 50))
+
+    set_status(task, 'Blocked', D(2026, 10, 11, 9))
+    rollup(now=D(2026, 10, 11, 9, 15)) # Overlap window reaches back into the 10th
+
+    assert snapshot(project, D(2026, 10, 10)).status_counts == {'In Progress': 1}
+    assert snapshot(project, D(2026, 10, 11)).status_counts == {'Blocked': 1}
+
+
+def test_rollup_after_missed_runs_matches_backfill(project):
+    tasks = [make_task(project, D(2026, 10, 9, 12), due_date=D(2026, 10, 11) if i < 3 else None)
+             for i in range(10)]
+    rollup(now=D(2026, 10, 10, 22))
+    # Cron misses the 11th and 12th.
+    for task in tasks[:5]:
+        set_status(task, 'Done', D(2026, 10, 13, 10))
+    now = D(2026, 10, 13, 12)
+    rollup(now=now)
+    from_rollup = project_series(project, days=4, now=now)
+
+    ProjectDailyMetrics.objects.delete()
+    backfill(now=now)
+    from_backfill = project_series(project, days=4, now=now)
+
+    assert [day['open'] for day in from_rollup] == [10, 10, 10, 5]
+    assert [day['overdue'] for day in from_rollup] == [0, 0, 3, 0]
+    assert from_rollup == from_backfill
+
+
+def test_task_is_overdue_only_after_its_due_day(project):
+    make_task(project, D(2026, 10, 1), due_date=D(2026, 10, 15))
+
+    assert _current_state(project.pk, D(2026, 10, 15, 10))['overdue_count'] == 0
+    assert _current_state(project.pk, D(2026, 10, 16, 0, 1))['overdue_count'] == 1
+
+    rollup(now=D(2026, 10, 15, 23))
+    assert rollup(now=D(2026, 10, 16, 0, 10)) == 1 # No task was saved: the due day ending triggers it
+    assert snapshot(project, D(2026, 10, 16)).overdue_count == 1
+
+    ProjectDailyMetrics.objects.delete()
+    backfill(now=D(2026, 10, 16, 12))
+    assert snapshot(project, D(2026, 10, 15)).overdue_count == 0
+    assert snapshot(project, D(2026, 10, 16)).overdue_count == 1